@@ -7,9 +7,13 @@ except ImportError:
 from ._dock_widget import OrthoViewerWidget
 from ._crop_dock_list_widget import CropListLabelsWidget
 from ._crop_dock_widget import CropLabelsWidget
+from ._playback import centroid_path
+from ._playback import line_path
 
 __all__ = (
     "OrthoViewerWidget",
     "CropListLabelsWidget",
     "CropLabelsWidget",
+    "centroid_path",
+    "line_path",
 )
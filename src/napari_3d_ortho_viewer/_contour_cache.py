@@ -0,0 +1,181 @@
+"""Cache label contours per ortho viewer and plane."""
+import hashlib
+import inspect
+from collections import OrderedDict
+from typing import Dict
+from typing import Hashable
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+import numpy as np
+from napari.layers import Labels
+
+from ._memory import MemoryBudget
+from ._memory import get_memory_budget
+
+# (axis, index) of every not displayed dimension of a layer
+Plane = Tuple[Tuple[int, int], ...]
+# parameters of the private Labels._calculate_contour, as of napari 0.4.19
+CONTOUR_PARAMETERS = ("labels", "data_slice")
+
+
+def current_plane(layer: Labels) -> Plane:
+    """Return the plane a layer currently displays."""
+    return tuple(
+        (axis, int(ind))
+        for axis, ind in enumerate(layer._slice_indices)
+        if not isinstance(ind, slice)
+    )
+
+
+def plane_digest(labels: np.ndarray) -> bytes:
+    """Return a digest of the labels of one plane."""
+    labels = np.ascontiguousarray(labels)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{labels.dtype.str} {labels.shape}".encode())
+    digest.update(labels.data)
+    return digest.digest()
+
+
+def is_full_slice(data_slice: Tuple[slice, ...], shape: Tuple[int]) -> bool:
+    """Check whether data_slice covers the whole array of shape."""
+    return all(
+        s.start in (0, None) and s.stop in (n, None) and s.step in (1, None)
+        for s, n in zip(data_slice, shape)
+    )
+
+
+class ContourCache:
+    """LRU cache of the contours of all labels layers of one viewer.
+
+    Contours are cached per layer and displayed plane. Entries are
+    invalidated for the planes touched by edits of the labels data, and
+    checked against a digest of the plane they were computed from.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 64,
+        memory: Optional[MemoryBudget] = None,
+    ):
+        """Initialize empty cache, name is the key in the memory budget."""
+        self.name = name
+        self.maxsize = maxsize
+        self.memory = get_memory_budget() if memory is None else memory
+        # plane digest and contour keyed by layer and plane in least
+        # recently used order
+        self.entries: Dict[
+            Tuple[Hashable, ...], Tuple[bytes, np.ndarray]
+        ] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Return the number of bytes held by cached contours."""
+        return sum(contour.nbytes for _, contour in self.entries.values())
+
+    def install(self, layer: Labels) -> bool:
+        """Serve contours of layer from this cache.
+
+        Returns False if the napari version does not allow it.
+        """
+        calculate_contour = getattr(layer, "_calculate_contour", None)
+        if calculate_contour is None:
+            return False
+        try:
+            parameters = inspect.signature(calculate_contour).parameters
+        except (TypeError, ValueError):
+            return False
+        if tuple(parameters) != CONTOUR_PARAMETERS:
+            return False
+
+        def _calculate_contour(labels, data_slice):
+            # partial updates while painting are never cached
+            if (
+                layer.contour < 1
+                or labels.ndim != 2
+                or not is_full_slice(data_slice, labels.shape)
+            ):
+                return calculate_contour(labels, data_slice)
+
+            key = (
+                layer.name,
+                current_plane(layer),
+                layer.contour,
+                layer.colormap.background_value,
+            )
+            # in place edits of the data are only seen in the plane itself
+            digest = plane_digest(labels)
+            contour = self.get(key, digest)
+            if contour is None or contour.shape != labels.shape:
+                self.misses += 1
+                contour = calculate_contour(labels, data_slice)
+                if contour is not None:
+                    self.put(key, digest, contour)
+            else:
+                self.hits += 1
+            return contour
+
+        layer._calculate_contour = _calculate_contour
+        return True
+
+    def get(
+        self, key: Tuple[Hashable, ...], digest: bytes
+    ) -> Optional[np.ndarray]:
+        """Return cached contour and mark it as most recently used.
+
+        Entries computed from a plane with another digest are removed.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] != digest:
+            del self.entries[key]
+            self.account()
+            return None
+        self.entries.move_to_end(key)
+        self.memory.touch("label contours", self.name)
+        return entry[1]
+
+    def put(
+        self, key: Tuple[Hashable, ...], digest: bytes, contour: np.ndarray
+    ) -> None:
+        """Cache contour, evicting least recently used entries if needed."""
+        self.entries[key] = (digest, contour)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        self.account()
+
+    def invalidate(self, touched: Dict[int, Set[int]]) -> None:
+        """Remove contours of planes with indices touched per axis."""
+        for key in list(self.entries):
+            if any(ind in touched.get(axis, ()) for axis, ind in key[1]):
+                del self.entries[key]
+        self.account()
+
+    def account(self) -> None:
+        """Update the memory budget, drop all entries if they do not fit."""
+        if not self.memory.request(
+            "label contours", self.name, self.nbytes, evict=self.clear
+        ):
+            # does not fit into the budget, rather recompute next time
+            self.entries.clear()
+
+    def clear(self) -> None:
+        """Remove all cached contours."""
+        self.entries.clear()
+        self.memory.release("label contours", self.name)
+
+
+def touched_planes(history_item) -> Dict[int, Set[int]]:
+    """Return plane indices per axis touched by a labels history item."""
+    touched: Dict[int, Set[int]] = {}
+    for indices, _, _ in history_item:
+        for axis, inds in enumerate(indices):
+            touched.setdefault(axis, set()).update(
+                int(i) for i in np.unique(inds)
+            )
+    return touched
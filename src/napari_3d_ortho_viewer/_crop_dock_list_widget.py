@@ -9,6 +9,8 @@ from magicgui.widgets import PushButton
 from magicgui.widgets import LineEdit
 from magicgui.widgets import Select
 
+from ._label_cache import LabelIndexCache
+
 
 def str_to_int_list(s: str, delimiter=",") -> List[int]:
     return [int(i) for i in s.split(delimiter) if i.isdigit()]
@@ -26,6 +28,7 @@ class CropListLabelsWidget(QWidget):
 
         self.old_viewer = viewer
         self.crop_viewer: Optional[napari.Viewer] = None
+        self.label_cache = LabelIndexCache()
 
         self.setLayout(QVBoxLayout())
 
@@ -49,22 +52,20 @@ class CropListLabelsWidget(QWidget):
         self.id_selection = None
         self.create_id_selection()
 
-    def create_id_selection(self) -> None:
-        """Create new id selection."""
+    def create_id_selection(self, force: bool = False) -> None:
+        """Create new id selection, force recomputes the label index."""
         if self.id_selection is not None:
             self.layout().removeWidget(self.id_selection.native)
 
         self.id_selection = Select(
             name="labels_ids_dropdown",
             label="Label IDs",
-            choices=self.labels_list(),
+            choices=self.labels_list(force),
         )
         self.layout().addWidget(self.id_selection.native)
 
-    def labels_list(self) -> List[int]:
+    def labels_list(self, force: bool = False) -> List[int]:
         """Return label ids of labels layer ordered by biggest area first."""
-        from skimage.measure import regionprops
-
         try:
             selected_layer = list(self.old_viewer.layers.selection)[0]
         except IndexError:
@@ -76,9 +77,10 @@ class CropListLabelsWidget(QWidget):
             ].index(True)
             selected_layer = self.old_viewer.layers[first_labels_layer_ind]
 
-        self.regions = regionprops(selected_layer.data)
-        area = np.array([reg.area for reg in self.regions])
-        labels_list = np.array([reg.label for reg in self.regions])
+        index = self.label_cache.get_layer(selected_layer, force=force)
+        self.bboxes = index["bboxes"]
+        area = index["areas"]
+        labels_list = index["labels"]
 
         sorted_area = np.argsort(area)[::-1]
         sorted_labels = labels_list[sorted_area]
@@ -90,7 +92,7 @@ class CropListLabelsWidget(QWidget):
         return list(sorted_labels)
 
     def update_ids(self) -> None:
-        self.create_id_selection()
+        self.create_id_selection(force=True)
 
     def get_slices(self) -> Tuple[slice]:
         ndim = self.old_viewer.dims.ndim
@@ -103,7 +105,7 @@ class CropListLabelsWidget(QWidget):
         ids_from_labels = [
             self.label_id_to_ind[j] for j in self.id_selection.value
         ]
-        bboxes = [self.regions[j].bbox for j in ids_from_labels]
+        bboxes = [self.bboxes[j] for j in ids_from_labels]
 
         for i in range(ndim):
             min_ = min([bbox[i] - padd for bbox in bboxes])
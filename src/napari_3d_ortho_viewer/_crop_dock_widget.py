@@ -8,6 +8,8 @@ from qtpy.QtWidgets import QVBoxLayout
 from magicgui.widgets import PushButton
 from magicgui.widgets import LineEdit
 
+from ._label_cache import LabelIndexCache
+
 
 def str_to_int_list(s: str, delimiter=",") -> List[int]:
     return [int(i) for i in s.split(delimiter) if i.isdigit()]
@@ -25,6 +27,7 @@ class CropLabelsWidget(QWidget):
 
         self.old_viewer = viewer
         self.crop_viewer: Optional[napari.Viewer] = None
+        self.label_cache = LabelIndexCache()
 
         self.setLayout(QVBoxLayout())
 
@@ -44,8 +47,6 @@ class CropLabelsWidget(QWidget):
         self.layout().addWidget(self.labels_field.native)
 
     def get_slices(self) -> Tuple[slice]:
-        from skimage.measure import regionprops
-
         ndim = self.old_viewer.dims.ndim
         padd = int(self.padding_field.value)
         if padd < 0:
@@ -62,20 +63,22 @@ class CropLabelsWidget(QWidget):
             ].index(True)
             selected_layer = self.old_viewer.layers[first_labels_layer_ind]
 
-        labels = selected_layer.data
         selected_labels = [
             int(lbl) for lbl in self.labels_field.value.split(",")
         ]
-
-        selected_area = np.zeros_like(labels, dtype=bool)
-        for lbl in selected_labels:
-            selected_area = np.logical_or(selected_area, labels == lbl)
-
-        regions = regionprops(selected_area.astype(np.uint8))
+        index = self.label_cache.get_layer(selected_layer)
+        if not np.isin(selected_labels, index["labels"]).all():
+            # the stored index might be stale, labels are rather recomputed
+            index = self.label_cache.get_layer(selected_layer, force=True)
+        selected = np.isin(index["labels"], selected_labels)
+        bboxes = index["bboxes"][selected]
+        if len(bboxes) == 0:
+            raise ValueError(
+                f"Labels {selected_labels} not found in {selected_layer.name}."
+            )
 
         slices = []
         for i in range(ndim):
-            bboxes = [region.bbox for region in regions]
             min_ = min([bbox[i] - padd for bbox in bboxes])
             if min_ < 0:
                 min_ = 0
@@ -1,21 +1,41 @@
 """Widget to start / stop 3D Ortho viewer."""
+import warnings
+from pathlib import Path
+from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
 
 import napari
 import numpy as np
 from magicgui.widgets import Checkbox
 from napari.layers import Image
 from napari.layers import Labels
+from napari.layers import Layer
 from qtpy.QtWidgets import QVBoxLayout
 from qtpy.QtWidgets import QWidget
 
+from ._contour_cache import ContourCache
+from ._contour_cache import touched_planes
+from ._label_cache import mark_edited
+from ._memory import get_memory_budget
+from ._playback import Playback
+from ._playback import Position
+from ._scheduler import FrameScheduler
+from ._sliced import PLANE_VIEWS
+from ._sliced import PlaneBuffer
+from ._sliced import plane_translate
 from .toggle_visibility import ToggleTwoVisibleLayers
 
 # from napari.layers.utils._link_layers import link_layers
 # from napari.layers.utils._link_layers import unlink_layers
 # from qtpy.QtWidgets import QDesktopWidget
 
+# z, y and x planes of every plane buffer through the current position
+Planes = List[Tuple[np.ndarray, np.ndarray, np.ndarray]]
+
 
 class OrthoViewerWidget(QWidget):
     """Widget to organize the ortho viewer."""
@@ -29,7 +49,11 @@ class OrthoViewerWidget(QWidget):
         # Old viewer will be used as 3d viewer
         self.old_viewer = viewer
 
-        self.shape = tuple(int(r[1]) for r in self.old_viewer.dims.range)
+        # positions are world coordinates, the slicing layers cover all
+        # layers with the finest step per axis
+        self.grid_scale = np.ones(3)
+        self.grid_translate = np.zeros(3)
+        self.shape: Tuple[int, ...] = ()
 
         self.xy_viewer: Optional[napari.Viewer] = None
         self.yz_viewer: Optional[napari.Viewer] = None
@@ -39,18 +63,44 @@ class OrthoViewerWidget(QWidget):
         self.img_layers: List[Image] = []
         self.sliced_img_layers: List[Image] = []
         self.toggle_img_layers: List[ToggleTwoVisibleLayers] = []
+        self.plane_buffers: List[PlaneBuffer] = []
+        # plane buffer, img layer and axis shown by each sliced img layer
+        self.sliced_planes: List[Tuple[PlaneBuffer, Image, int]] = []
         self.old_len_undo_histories: Optional[int] = None
+        self.vol_slicing_plane: Optional[Labels] = None
+        self.vol_slicing_lines: Optional[Labels] = None
+        self.contour_caches: List[ContourCache] = []
+        self._painted = False
+        self.click_history: List[Position] = []
+        self.playback: Optional[Playback] = None
+
+        # the accountant is shared, keys of this widget start with a prefix
+        self.memory = get_memory_budget()
+        self.memory_prefix = f"ortho {id(self):x} | "
 
         self.setLayout(QVBoxLayout())
         self.checkbox = Checkbox(text="Start/Stop Ortho View")
         self.checkbox.changed.connect(self.checkbox_changed)
         self.layout().addWidget(self.checkbox.native)
 
+        # hovering moves the position, throttled to one update per frame
+        self.follow_checkbox = Checkbox(text="Follow cursor")
+        self.layout().addWidget(self.follow_checkbox.native)
+        self.hover_scheduler = FrameScheduler(
+            self.extract_planes_at, self.apply_planes_at, parent=self
+        )
+        self._setting_position = False
+        # counts starts and stops, hover jobs of an older one are dropped
+        self.generation = 0
+
     def checkbox_changed(self) -> None:
         """Either start or stop 3D Ortho viewer."""
+        self.generation += 1
         if self.checkbox.value:
             self.start_ortho_viewer()
         else:
+            self.hover_scheduler.cancel()
+            self.stop_playback()
             self.delete_viewer(self.xy_viewer)
             self.delete_viewer(self.yz_viewer)
             self.delete_viewer(self.xz_viewer)
@@ -58,15 +108,28 @@ class OrthoViewerWidget(QWidget):
             self.yz_viewer = None
             self.xz_viewer = None
 
-            self.delete_named_layer(self.old_viewer, "slicing plane")
-            self.delete_named_layer(self.old_viewer, "slicing lines")
+            if self.vol_slicing_plane is not None:
+                self.delete_named_layer(self.old_viewer, "slicing plane")
+                self.delete_named_layer(self.old_viewer, "slicing lines")
+            self.vol_slicing_plane = None
+            self.vol_slicing_lines = None
             for layer in self.sliced_img_layers:
                 self.delete_named_layer(self.old_viewer, layer.name)
+            self.memory.release_prefix(self.memory_prefix)
 
             self.lbl_layers.clear()
             self.img_layers.clear()
             self.sliced_img_layers.clear()
             self.toggle_img_layers.clear()
+            self.plane_buffers.clear()
+            self.sliced_planes.clear()
+            for cache in self.contour_caches:
+                cache.clear()
+            self.contour_caches.clear()
+
+    def memory_key(self, name: str) -> str:
+        """Return key of name in the memory budget unique to this widget."""
+        return f"{self.memory_prefix}{name}"
 
     @staticmethod
     def delete_viewer(viewer: napari.Viewer) -> None:
@@ -84,10 +147,37 @@ class OrthoViewerWidget(QWidget):
         viewer.layers.pop(layer_names.index(name))
 
     def add_slicing(
-        self, viewer: napari.Viewer, name: str = "slicing"
-    ) -> None:
-        """Add labels layer initialized with zeros of same shape."""
-        return viewer.add_labels(np.zeros(self.shape, dtype=int), name=name)
+        self,
+        viewer: napari.Viewer,
+        name: str = "slicing",
+        required: bool = True,
+        axis: Optional[int] = None,
+    ) -> Optional[Labels]:
+        """Add labels layer initialized with zeros on the slicing grid.
+
+        With axis the layer is a single plane normal to axis, moved by
+        update_slicing. Optional layers are not added if they exceed the
+        memory budget, required layers only warn.
+        """
+        shape = list(self.shape)
+        if axis is not None:
+            shape[axis] = 1
+        nbytes = int(np.prod(shape))
+        key = self.memory_key(f"{viewer.title} | {name}")
+        if not self.memory.request("slicing", key, nbytes, force=required):
+            if not required:
+                return None
+            warnings.warn(
+                f"Slicing layer {name!r} of {viewer.title!r} exceeds the "
+                "memory budget.",
+                stacklevel=2,
+            )
+        return viewer.add_labels(
+            np.zeros(shape, dtype=np.uint8),
+            name=name,
+            scale=self.grid_scale,
+            translate=self.grid_translate,
+        )
 
     def add_layers(
         self,
@@ -102,21 +192,70 @@ class OrthoViewerWidget(QWidget):
 
     def prepare_old_viewer(self) -> None:
         """Find lbl and img layers and add sliced img layer."""
+        img_layers = []
         for layer in self.old_viewer.layers:
             layer.refresh()
             if isinstance(layer, Labels):
                 self.lbl_layers.append(layer)
             if isinstance(layer, Image):
-                self.img_layers.append(layer)
-
-        for layer in self.img_layers:
-            name = f"sliced {layer.name}"
-            new_layer = self.old_viewer.add_image(
-                np.zeros_like(layer.data), name=name, rendering="iso"
+                img_layers.append(layer)
+
+        # channels of equal shape share the buffer of their sliced planes
+        groups = {}
+        for layer in img_layers:
+            key = (
+                layer.data.shape,
+                np.dtype(layer.data.dtype).str,
+                tuple(layer.scale),
+                tuple(layer.translate),
             )
-            toggle = ToggleTwoVisibleLayers(layer, new_layer)
-            self.sliced_img_layers.append(new_layer)
-            self.toggle_img_layers.append(toggle)
+            groups.setdefault(key, []).append(layer)
+
+        # only img layers within the memory budget get sliced img layers
+        for layers in groups.values():
+            buffer = PlaneBuffer(layers)
+            # every sliced img layer shows one plane of one channel
+            sliced = [
+                (layer, axis, f"sliced {layer.name} | {view}")
+                for layer in layers
+                for axis, view in enumerate(PLANE_VIEWS)
+            ]
+            if not all(
+                self.memory.request(
+                    "sliced images",
+                    self.memory_key(name),
+                    buffer.plane_nbytes(axis),
+                )
+                for _, axis, name in sliced
+            ):
+                for _, _, name in sliced:
+                    self.memory.release("sliced images", self.memory_key(name))
+                names = ", ".join(layer.name for layer in layers)
+                warnings.warn(
+                    f"Skipping sliced {names!r}, exceeds the memory budget.",
+                    stacklevel=2,
+                )
+                continue
+            buffer.allocate()
+            self.plane_buffers.append(buffer)
+            self.img_layers.extend(layers)
+
+            for layer, axis, name in sliced:
+                # views on the buffer, hence no copy of the img layer
+                new_layer = self.old_viewer.add_image(
+                    buffer.plane(axis, layers.index(layer)),
+                    scale=layer.scale,
+                    translate=layer.translate,
+                    name=name,
+                    rgb=layer.rgb,
+                    contrast_limits=layer.contrast_limits,
+                    blending=layer.blending,
+                    **({} if layer.rgb else {"colormap": layer.colormap}),
+                )
+                toggle = ToggleTwoVisibleLayers(layer, new_layer)
+                self.sliced_img_layers.append(new_layer)
+                self.sliced_planes.append((buffer, layer, axis))
+                self.toggle_img_layers.append(toggle)
 
     def create_other_viewers(self) -> None:
         """Create ortho viewers and populate them with copied layers."""
@@ -129,23 +268,47 @@ class OrthoViewerWidget(QWidget):
 
     def add_slicing_layers(self) -> None:
         """Add a slicing layer per viewer to indicate current position in volume."""
-        self.xy_slicing = self.add_slicing(self.xy_viewer)
-        self.yz_slicing = self.add_slicing(self.yz_viewer)
-        self.xz_slicing = self.add_slicing(self.xz_viewer)
+        # the ortho views only show the plane through the position
+        self.xy_slicing = self.add_slicing(self.xy_viewer, axis=0)
+        self.yz_slicing = self.add_slicing(self.yz_viewer, axis=2)
+        self.xz_slicing = self.add_slicing(self.xz_viewer, axis=1)
 
+        # the 3d indicators are optional and only added within the budget
         self.vol_slicing_plane = self.add_slicing(
-            self.old_viewer, name="slicing plane"
+            self.old_viewer, name="slicing plane", required=False
         )
         self.vol_slicing_lines = self.add_slicing(
-            self.old_viewer, name="slicing lines"
-        )
-        self.toggle_vol_slicing = ToggleTwoVisibleLayers(
-            self.vol_slicing_plane, self.vol_slicing_lines
+            self.old_viewer, name="slicing lines", required=False
         )
+        if self.vol_slicing_plane is None or self.vol_slicing_lines is None:
+            warnings.warn(
+                "Skipping 3d slicing layers, they exceed the memory budget.",
+                stacklevel=2,
+            )
+            for layer in [self.vol_slicing_plane, self.vol_slicing_lines]:
+                if layer is not None:
+                    self.delete_named_layer(self.old_viewer, layer.name)
+                    self.memory.release(
+                        "slicing",
+                        self.memory_key(
+                            f"{self.old_viewer.title} | {layer.name}"
+                        ),
+                    )
+            self.vol_slicing_plane = None
+            self.vol_slicing_lines = None
+            n_vol_slicing = 0
+        else:
+            self.toggle_vol_slicing = ToggleTwoVisibleLayers(
+                self.vol_slicing_plane, self.vol_slicing_lines
+            )
+            n_vol_slicing = 2
+
         # by default select not the slicing layers
         for v in [self.xy_viewer, self.yz_viewer, self.xz_viewer]:
             v.layers.selection = [v.layers[-2]]
-        self.old_viewer.layers.selection = [self.old_viewer.layers[-3]]
+        self.old_viewer.layers.selection = [
+            self.old_viewer.layers[-1 - n_vol_slicing]
+        ]
 
     def orient_all_viewers(self) -> None:
         """First reset current_step and then roll some views accordingly."""
@@ -203,6 +366,8 @@ class OrthoViewerWidget(QWidget):
         # this is needed to avoid errors and warnings if the old viewer is in 3d mode
         self.old_viewer.dims.ndisplay = 2
 
+        self.find_slicing_grid()
+
         self.prepare_old_viewer()
 
         self.create_other_viewers()
@@ -222,6 +387,7 @@ class OrthoViewerWidget(QWidget):
         self.x_ind = 0
         for v in [self.xy_viewer, self.yz_viewer, self.xz_viewer]:
             v.dims.events.current_step.connect(self.update_all)
+            v.mouse_move_callbacks.append(self.mouse_move)
 
         # display changes in the lbl layers in all viewers and connect double clicks
         for v in [
@@ -239,19 +405,26 @@ class OrthoViewerWidget(QWidget):
                     layer.events.set_data.connect(self.refresh_on_set_data)
                     self.lbl_layers.append(layer)
 
-        # set contour to 1
+        # set contour to 1, contours are cached per viewer and plane
         for v in [self.xy_viewer, self.yz_viewer, self.xz_viewer]:
+            cache = ContourCache(self.memory_key(v.title))
+            self.contour_caches.append(cache)
             for layer in v.layers:
                 if not layer.name.startswith("slicing") and isinstance(
                     layer, Labels
                 ):
+                    cache.install(layer)
                     layer.contour = 1
+                    layer.events.paint.connect(self.invalidate_contours)
+                    layer.events.data.connect(self.clear_contours)
 
         for layer in self.old_viewer.layers:
             if isinstance(layer, Labels) and not layer.name.startswith(
                 "slicing"
             ):
                 layer.events.set_data.connect(self.refresh_on_set_data)
+                layer.events.paint.connect(self.invalidate_contours)
+                layer.events.data.connect(self.clear_contours)
 
         self.update_all()
 
@@ -265,6 +438,12 @@ class OrthoViewerWidget(QWidget):
         len_history = self.len_undo_histories()
         if len_history != self.old_len_undo_histories:
             self.old_len_undo_histories = len_history
+            for layer in self.lbl_layers:
+                mark_edited(layer.data)
+            # undo and redo do not tell which planes they changed
+            if not self._painted:
+                self.clear_contours()
+            self._painted = False
             for layer in self.lbl_layers:
                 layer.refresh()
             # print(event.sources)
@@ -280,31 +459,130 @@ class OrthoViewerWidget(QWidget):
             #     print("clearing")
             #     self.current_sources.clear()
 
-    def update_all(self, event=None) -> None:
-        """Update the slicing layers."""
-        z_ind = self.xy_viewer.dims.current_step[0]
-        y_ind = self.xz_viewer.dims.current_step[1]
-        x_ind = self.yz_viewer.dims.current_step[2]
-
-        # volume slicing via planes
-        self.vol_slicing_plane.data[self.z_ind, ...] = 0
-        self.vol_slicing_plane.data[:, self.y_ind, :] = 0
-        self.vol_slicing_plane.data[..., self.x_ind] = 0
+    def invalidate_contours(self, event) -> None:
+        """Drop cached contours of the planes touched by a paint event."""
+        self._painted = True
+        mark_edited(event.source.data)
+        touched = touched_planes(event.value)
+        for cache in self.contour_caches:
+            cache.invalidate(touched)
 
-        self.vol_slicing_plane.data[z_ind, ...] = 1
-        self.vol_slicing_plane.data[:, y_ind, :] = 2
-        self.vol_slicing_plane.data[..., x_ind] = 3
+    def clear_contours(self, event=None) -> None:
+        """Drop all cached contours."""
+        for cache in self.contour_caches:
+            cache.clear()
 
-        # volume slicing via lines
-        self.vol_slicing_lines.data[self.z_ind, self.y_ind, :] = 0
-        self.vol_slicing_lines.data[self.z_ind, :, self.x_ind] = 0
-        self.vol_slicing_lines.data[:, self.y_ind, self.x_ind] = 0
+    def update_all(self, event=None) -> None:
+        """Update the slicing layers."""
+        if self._setting_position:
+            return
+        point = (
+            self.xy_viewer.dims.point[0],
+            self.xz_viewer.dims.point[1],
+            self.yz_viewer.dims.point[2],
+        )
+        self.update_slicing(*point)
+
+    def find_slicing_grid(self) -> None:
+        """Cover the img and lbl layers with the finest step per axis."""
+        layers = [
+            layer
+            for layer in self.old_viewer.layers
+            if isinstance(layer, (Image, Labels))
+            and not layer.name.startswith(("slicing", "sliced"))
+        ]
+        if not layers:
+            raise RuntimeError("Ortho view needs an img or lbl layer!")
+
+        # world coordinates of the first and last voxel of every layer
+        corners = []
+        for layer in layers:
+            last = np.array(layer.data.shape[: layer.ndim]) - 1
+            corners.append(layer.data_to_world(np.zeros(layer.ndim)))
+            corners.append(layer.data_to_world(last))
+        low = np.min(corners, axis=0)
+        high = np.max(corners, axis=0)
+
+        self.grid_scale = np.min(
+            [np.abs(layer.scale) for layer in layers], axis=0
+        )
+        self.grid_translate = low
+        n_steps = np.ceil((high - low) / self.grid_scale - 1e-6)
+        self.shape = tuple(int(n) + 1 for n in n_steps)
+
+    def grid_indices(self, point: Sequence[float]) -> Tuple[int, ...]:
+        """Convert world point to indices within the slicing layers."""
+        coords = (np.asarray(point) - self.grid_translate) / self.grid_scale
+        coords = np.round(coords).astype(int)
+        return tuple(
+            int(c) for c in np.clip(coords, 0, np.array(self.shape) - 1)
+        )
 
-        self.vol_slicing_lines.data[z_ind, y_ind, :] = 1
-        self.vol_slicing_lines.data[z_ind, :, x_ind] = 2
-        self.vol_slicing_lines.data[:, y_ind, x_ind] = 3
+    def grid_plane_translate(self, axis: int, ind: int) -> np.ndarray:
+        """Return translate of a grid plane at index ind along axis."""
+        translate = np.array(self.grid_translate, dtype=float)
+        translate[axis] += ind * self.grid_scale[axis]
+        return translate
 
-        # slicing in ortho views
+    @staticmethod
+    def world_to_indices(layer: Layer, point) -> Tuple[int, ...]:
+        """Convert world point to indices within the data of layer."""
+        coords = np.round(layer.world_to_data(point)).astype(int)
+        shape = np.array(layer.data.shape[: layer.ndim])
+        return tuple(int(c) for c in np.clip(coords, 0, shape - 1))
+
+    def extract_planes(self, z: float, y: float, x: float) -> Planes:
+        """Read the three planes through world point of every buffer.
+
+        This only reads data and can therefore run outside the GUI thread.
+        """
+        return [
+            buffer.extract(*self.world_to_indices(buffer.layers[0], (z, y, x)))
+            for buffer in list(self.plane_buffers)
+        ]
+
+    def frame_nbytes(self) -> int:
+        """Return the number of bytes of the planes of one position."""
+        return sum(buffer.nbytes for buffer in self.plane_buffers)
+
+    def update_slicing(
+        self,
+        z: float,
+        y: float,
+        x: float,
+        planes: Optional[Planes] = None,
+    ) -> None:
+        """Move slicing layers and sliced img layers to world point.
+
+        Without extracted planes the buffers are filled from the layers.
+        """
+        z_ind, y_ind, x_ind = self.grid_indices((z, y, x))
+        slicing_layers = [self.xy_slicing, self.xz_slicing, self.yz_slicing]
+        if self.vol_slicing_plane is not None:
+            slicing_layers += [self.vol_slicing_lines, self.vol_slicing_plane]
+
+            # volume slicing via planes
+            self.vol_slicing_plane.data[self.z_ind, ...] = 0
+            self.vol_slicing_plane.data[:, self.y_ind, :] = 0
+            self.vol_slicing_plane.data[..., self.x_ind] = 0
+
+            self.vol_slicing_plane.data[z_ind, ...] = 1
+            self.vol_slicing_plane.data[:, y_ind, :] = 2
+            self.vol_slicing_plane.data[..., x_ind] = 3
+
+            # volume slicing via lines
+            self.vol_slicing_lines.data[self.z_ind, self.y_ind, :] = 0
+            self.vol_slicing_lines.data[self.z_ind, :, self.x_ind] = 0
+            self.vol_slicing_lines.data[:, self.y_ind, self.x_ind] = 0
+
+            self.vol_slicing_lines.data[z_ind, y_ind, :] = 1
+            self.vol_slicing_lines.data[z_ind, :, x_ind] = 2
+            self.vol_slicing_lines.data[:, y_ind, x_ind] = 3
+
+        # slicing in ortho views, each a single plane moved to the position
+        self.xy_slicing.translate = self.grid_plane_translate(0, z_ind)
+        self.yz_slicing.translate = self.grid_plane_translate(2, x_ind)
+        self.xz_slicing.translate = self.grid_plane_translate(1, y_ind)
         self.xy_slicing.data[:, self.y_ind, :] = 0
         self.xy_slicing.data[..., self.x_ind] = 0
         self.xy_slicing.data[:, y_ind, :] = 2
@@ -320,36 +598,151 @@ class OrthoViewerWidget(QWidget):
         self.xz_slicing.data[z_ind, ...] = 1
         self.xz_slicing.data[..., x_ind] = 3
 
-        for layer, sl_layer in zip(self.img_layers, self.sliced_img_layers):
-            sl_layer.data[self.z_ind, ...] = 0
-            sl_layer.data[:, self.y_ind, :] = 0
-            sl_layer.data[..., self.x_ind] = 0
-
-            sl_layer.data[z_ind, ...] = layer.data[z_ind, ...]
-            sl_layer.data[:, y_ind, :] = layer.data[:, y_ind, ...]
-            sl_layer.data[..., x_ind] = layer.data[..., x_ind]
-
+        if planes is None:
+            planes = [None] * len(self.plane_buffers)
+        for buffer, buffer_planes in zip(self.plane_buffers, planes):
+            buffer.fill(
+                *self.world_to_indices(buffer.layers[0], (z, y, x)),
+                buffer_planes,
+            )
+        for sl_layer, (buffer, layer, axis) in zip(
+            self.sliced_img_layers, self.sliced_planes
+        ):
+            sl_layer.translate = plane_translate(
+                layer, axis, buffer.position[axis]
+            )
             sl_layer.refresh()
 
-        for s in [
-            self.vol_slicing_lines,
-            self.vol_slicing_plane,
-            self.xy_slicing,
-            self.xz_slicing,
-            self.yz_slicing,
-        ]:
+        for s in slicing_layers:
             s.refresh()
 
         self.z_ind = z_ind
         self.y_ind = y_ind
         self.x_ind = x_ind
 
+    def set_position(
+        self,
+        z: float,
+        y: float,
+        x: float,
+        planes: Optional[Planes] = None,
+    ) -> None:
+        """Move all ortho viewers to world point and update slicing once."""
+        self._setting_position = True
+        try:
+            for v in [self.xy_viewer, self.yz_viewer, self.xz_viewer]:
+                v.dims.set_point(range(3), (z, y, x))
+        finally:
+            self._setting_position = False
+
+        self.update_slicing(z, y, x, planes)
+
     def mouse_click(self, viewer, event):
         """Change current step of other viewers on mouse click."""
-        data_coordinates = viewer.layers[0].world_to_data(event.position)
-        coords = np.round(data_coordinates).astype(int)
+        position = self.clip_position(event.position)
+        self.click_history.append(position)
+        self.set_position(*position)
+
+    def mouse_move(self, viewer, event):
+        """Follow the cursor in the ortho views if enabled."""
+        if not self.follow_checkbox.value or self.xy_viewer is None:
+            return
+        self.hover_scheduler.submit(
+            (self.generation, self.clip_position(event.position))
+        )
+
+    def extract_planes_at(self, job: Tuple[int, Position]) -> Planes:
+        """Read planes of position, runs in the hover worker thread."""
+        _, position = job
+        return self.extract_planes(*position)
+
+    def apply_planes_at(
+        self,
+        job: Tuple[int, Position],
+        planes: Planes,
+    ) -> None:
+        """Move to position with planes read by the hover worker thread.
+
+        Planes read before the ortho view was stopped or restarted belong
+        to other plane buffers and are dropped.
+        """
+        generation, position = job
+        if generation != self.generation or self.xy_viewer is None:
+            return
+        self.set_position(*position, planes=planes)
+
+    @property
+    def hover_update_latency(self) -> Optional[float]:
+        """Return mean s from cursor movement until all layers are updated.
+
+        This excludes rendering the canvases, which napari does afterwards.
+        """
+        return self.hover_scheduler.mean_latency
+
+    def clip_position(self, position: Sequence[float]) -> Position:
+        """Clip world point to the extent of all layers."""
+        high = (
+            self.grid_translate + (np.array(self.shape) - 1) * self.grid_scale
+        )
+        return tuple(
+            float(c) for c in np.clip(position, self.grid_translate, high)
+        )
+
+    def play(
+        self,
+        positions: Sequence[Position],
+        fps: float = 10.0,
+        lookahead: int = 8,
+        output_dir: Optional[Union[str, Path]] = None,
+    ) -> Playback:
+        """Move through positions at fps and optionally export all views.
+
+        Use e.g. line_path, centroid_path or click_history as positions in
+        world coordinates, they are clipped to the extent of all layers.
+        Errors stop playback and are kept in the error of the returned
+        playback. Raises RuntimeError if playback does not fit into the
+        memory budget.
+        """
+        if self.xy_viewer is None:
+            raise RuntimeError("Start the ortho view before playback!")
+        self.stop_playback()
+        playback = Playback(
+            self,
+            positions,
+            fps=fps,
+            lookahead=lookahead,
+            output_dir=output_dir,
+            parent=self,
+        )
+        playback.start()
+        self.playback = playback
+        return playback
+
+    def stop_playback(self) -> None:
+        """Stop a running playback."""
+        if self.playback is not None:
+            self.playback.stop()
+            self.playback = None
+
+    def screenshot_views(self) -> Dict[str, np.ndarray]:
+        """Return screenshots of the canvases of all four views."""
+        return {
+            name: v.screenshot(canvas_only=True, flash=False)
+            for name, v in self.views()
+        }
+
+    def screenshot_nbytes(self) -> int:
+        """Return the number of bytes of the screenshots of all views."""
+        return sum(
+            4 * int(np.prod(v.window._qt_viewer.canvas.physical_size))
+            for _, v in self.views()
+        )
 
-        for i, c in enumerate(coords):
-            self.xy_viewer.dims.set_current_step(i, c)
-            self.yz_viewer.dims.set_current_step(i, c)
-            self.xz_viewer.dims.set_current_step(i, c)
+    def views(self) -> List[Tuple[str, napari.Viewer]]:
+        """Return all four viewers by view name."""
+        return [
+            ("xy", self.xy_viewer),
+            ("yz", self.yz_viewer),
+            ("xz", self.xz_viewer),
+            ("3d", self.old_viewer),
+        ]
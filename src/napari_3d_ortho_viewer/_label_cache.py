@@ -0,0 +1,259 @@
+"""Persistent on-disk cache for label indexes (areas, bboxes, centroids)."""
+import contextlib
+import hashlib
+import os
+import weakref
+import zipfile
+from pathlib import Path
+from typing import Dict
+from typing import Optional
+from typing import Union
+
+import numpy as np
+
+LabelIndex = Dict[str, np.ndarray]
+
+# environment variable to overwrite the default cache directory
+CACHE_DIR_ENV = "NAPARI_3D_ORTHO_VIEWER_CACHE_DIR"
+# bump when the layout of the stored label index changes
+INDEX_VERSION = 2
+INDEX_KEYS = ("labels", "areas", "bboxes", "centroids", "anchors")
+# arrays up to this size are hashed completely
+FULL_HASH_NBYTES = 64 * 2**20
+# bigger arrays are hashed by a strided subsample over all axes of this size
+SAMPLE_NBYTES = 16 * 2**20
+# and by this many complete slabs along the first axis
+N_HASH_SLABS = 8
+# a stored index is only used if the voxels of this many labels still match
+N_CHECK_ANCHORS = 64
+# least recently used entries are removed beyond this size of the directory
+MAX_CACHE_NBYTES = 256 * 2**20
+
+# data of labels layers edited in this session, keyed by id
+_edited_data = weakref.WeakValueDictionary()
+
+
+def default_cache_dir() -> Path:
+    """Return the cache directory, following $XDG_CACHE_HOME if set."""
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if cache_dir:
+        return Path(cache_dir)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "napari-3d-ortho-viewer" / "label-index"
+
+
+def fingerprint(data) -> str:
+    """Return a fast content hash of data including shape and dtype.
+
+    Small arrays are hashed completely. Big arrays are hashed by a strided
+    subsample spread over the whole volume and a few complete slabs along
+    the first axis, so edits that miss all sampled voxels are not detected.
+    """
+    dtype = np.dtype(data.dtype)
+    shape = tuple(int(s) for s in data.shape)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((shape, dtype.str)).encode())
+
+    nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+    if len(shape) == 0 or nbytes <= FULL_HASH_NBYTES:
+        h.update(np.ascontiguousarray(data))
+    else:
+        step = int(np.ceil((nbytes / SAMPLE_NBYTES) ** (1 / len(shape))))
+        h.update(
+            np.ascontiguousarray(data[(slice(None, None, step),) * len(shape)])
+        )
+        inds = np.linspace(0, shape[0] - 1, N_HASH_SLABS).astype(int)
+        for i in np.unique(inds):
+            h.update(np.ascontiguousarray(data[i]))
+    return h.hexdigest()
+
+
+def mark_edited(data) -> None:
+    """Remember that data was edited in this session."""
+    # data that does not support weak references cannot be tracked
+    with contextlib.suppress(TypeError):
+        _edited_data[id(data)] = data
+
+
+def is_edited(layer) -> bool:
+    """Check whether the data of a labels layer was edited in this session.
+
+    Layers in the ortho views share their data with the original layer, so
+    edits are tracked per data as well as by the undo history of layer.
+    """
+    if _edited_data.get(id(layer.data)) is layer.data:
+        return True
+    return bool(
+        getattr(layer, "_undo_history", None)
+        or getattr(layer, "_redo_history", None)
+    )
+
+
+def compute_label_index(data) -> LabelIndex:
+    """Compute label ids, areas, bounding boxes and centroids of data."""
+    from skimage.measure import regionprops
+
+    data = np.asarray(data)
+    ndim = data.ndim
+    regions = regionprops(data)
+    return {
+        "labels": np.array([reg.label for reg in regions], dtype=np.int64),
+        "areas": np.array([reg.area for reg in regions], dtype=np.int64),
+        "bboxes": np.array(
+            [reg.bbox for reg in regions], dtype=np.int64
+        ).reshape(-1, 2 * ndim),
+        "centroids": np.array(
+            [reg.centroid for reg in regions], dtype=float
+        ).reshape(-1, ndim),
+        # one voxel of every label to validate stored indexes
+        "anchors": np.array(
+            [
+                np.add(
+                    reg.bbox[:ndim],
+                    np.unravel_index(np.argmax(reg.image), reg.image.shape),
+                )
+                for reg in regions
+            ],
+            dtype=np.int64,
+        ).reshape(-1, ndim),
+    }
+
+
+class LabelIndexCache:
+    """Store label indexes on disk keyed by the fingerprint of the data."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_nbytes: int = MAX_CACHE_NBYTES,
+    ):
+        """Initialize cache in cache_dir or the default cache directory."""
+        if cache_dir is None:
+            cache_dir = default_cache_dir()
+        self.cache_dir = Path(cache_dir)
+        self.max_nbytes = max_nbytes
+
+    def path(self, key: str) -> Path:
+        """Return file path of the cache entry for key."""
+        return self.cache_dir / f"{key}.npz"
+
+    def get(self, data, force: bool = False) -> LabelIndex:
+        """Load the label index of data or compute and store it.
+
+        With force the index is always recomputed and stored.
+        """
+        key = fingerprint(data)
+        index = None if force else self.load(data, key)
+        if index is None:
+            index = compute_label_index(data)
+            self.save(data, index, key)
+        return index
+
+    def get_layer(self, layer, force: bool = False) -> LabelIndex:
+        """Return the label index of a labels layer.
+
+        Layers edited in this session bypass the disk cache, since the
+        sampled fingerprint of big arrays can miss their edits.
+        """
+        if is_edited(layer):
+            return compute_label_index(layer.data)
+        return self.get(layer.data, force=force)
+
+    def load(self, data, key: Optional[str] = None) -> Optional[LabelIndex]:
+        """Return the stored label index of data or None if not valid."""
+        if key is None:
+            key = fingerprint(data)
+        path = self.path(key)
+        if not path.is_file():
+            return None
+
+        try:
+            with np.load(path, allow_pickle=False) as f:
+                stored = {k: f[k] for k in f.files}
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+
+        if not self.is_valid(stored, data, key):
+            return None
+        # the modification time orders entries by their last use
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return {k: stored[k] for k in INDEX_KEYS}
+
+    def save(self, data, index: LabelIndex, key: Optional[str] = None) -> None:
+        """Store label index of data, failing silently as it is a cache."""
+        if key is None:
+            key = fingerprint(data)
+        path = self.path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    version=np.array(INDEX_VERSION),
+                    key=np.array(key),
+                    shape=np.array(data.shape, dtype=np.int64),
+                    dtype=np.array(np.dtype(data.dtype).str),
+                    **index,
+                )
+            os.replace(tmp_path, path)
+            self.prune()
+        except OSError:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def prune(self) -> None:
+        """Remove least recently used entries beyond max_nbytes."""
+        entries = []
+        for path in self.cache_dir.glob("*.npz"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        nbytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if nbytes <= self.max_nbytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            nbytes -= size
+
+    @staticmethod
+    def is_valid(stored: LabelIndex, data, key: str) -> bool:
+        """Cheaply check that a stored entry belongs to data."""
+        if any(k not in stored for k in INDEX_KEYS):
+            return False
+        ndim = len(data.shape)
+        n = len(stored["labels"])
+        return (
+            int(stored.get("version", -1)) == INDEX_VERSION
+            and str(stored.get("key", "")) == key
+            and tuple(stored.get("shape", ())) == tuple(data.shape)
+            and str(stored.get("dtype", "")) == np.dtype(data.dtype).str
+            and stored["areas"].shape == (n,)
+            and stored["bboxes"].shape == (n, 2 * ndim)
+            and stored["centroids"].shape == (n, ndim)
+            and stored["anchors"].shape == (n, ndim)
+            and anchors_match(stored, data)
+        )
+
+
+def anchors_match(stored: LabelIndex, data) -> bool:
+    """Check that evenly spread labels are still found at their anchors."""
+    n = len(stored["labels"])
+    inds = np.unique(
+        np.linspace(0, n - 1, min(n, N_CHECK_ANCHORS)).astype(int)
+    )
+    shape = np.array(data.shape)
+    for i in inds:
+        anchor = stored["anchors"][i]
+        if np.any(anchor < 0) or np.any(anchor >= shape):
+            return False
+        if data[tuple(int(a) for a in anchor)] != stored["labels"][i]:
+            return False
+    return True
@@ -0,0 +1,167 @@
+"""Central accounting of the memory allocated by this plugin."""
+import math
+import os
+from collections import OrderedDict
+from typing import Callable
+from typing import Dict
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+# environment variable to configure the budget, e.g. "512M" or "4G"
+BUDGET_ENV = "NAPARI_3D_ORTHO_VIEWER_MEMORY_BUDGET"
+UNITS = {"": 1, "K": 2**10, "M": 2**20, "G": 2**30, "T": 2**40}
+
+
+def parse_nbytes(s: str) -> int:
+    """Parse sizes like '1024', '512M' or '4GB' to number of bytes."""
+    s = s.strip().upper()
+    if s.endswith("B"):
+        s = s[:-1]
+    unit = s[-1:] if s[-1:] in UNITS else ""
+    number = s[: len(s) - len(unit)]
+    try:
+        number = float(number)
+    except ValueError as e:
+        raise ValueError(f"Can not parse memory size {s!r}") from e
+    if not math.isfinite(number):
+        raise ValueError(f"Memory size {s!r} must be finite")
+    nbytes = int(number * UNITS[unit])
+    if nbytes < 0:
+        raise ValueError("Memory size must not be negative")
+    return nbytes
+
+
+class Allocation(NamedTuple):
+    """Bytes held by one key of a feature and how to free them."""
+
+    nbytes: int
+    evict: Optional[Callable[[], None]]
+
+
+class MemoryBudget:
+    """Account bytes per feature and layer and enforce an optional budget.
+
+    Allocations registered with an evict callback are caches. They are
+    evicted in least recently used order when a new allocation would exceed
+    the budget. All other allocations are only freed by release.
+    """
+
+    def __init__(self, budget: Optional[int] = None):
+        """Initialize accountant with budget in bytes, None is unlimited."""
+        self.budget = budget
+        # keys are (feature, key) in least recently used order
+        self.allocations: Dict[Tuple[str, str], Allocation] = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> "MemoryBudget":
+        """Create accountant with budget read from the environment."""
+        budget = os.environ.get(BUDGET_ENV)
+        return cls(parse_nbytes(budget) if budget else None)
+
+    @property
+    def used(self) -> int:
+        """Return the number of bytes currently accounted for."""
+        return sum(a.nbytes for a in self.allocations.values())
+
+    @property
+    def available(self) -> Optional[int]:
+        """Return the number of bytes left, None if unlimited."""
+        if self.budget is None:
+            return None
+        return self.budget - self.used
+
+    def fits(self, nbytes: int) -> bool:
+        """Check whether nbytes fit into the budget without evictions."""
+        return self.budget is None or nbytes <= self.available
+
+    def request(
+        self,
+        feature: str,
+        key: str,
+        nbytes: int,
+        evict: Optional[Callable[[], None]] = None,
+        force: bool = False,
+    ) -> bool:
+        """Account nbytes for key of feature if they fit into the budget.
+
+        Caches are evicted in LRU order to make room. Returns False without
+        accounting anything if the request does not fit. With force the
+        allocation is accounted anyway, e.g. when it can not be avoided.
+        """
+        nbytes = int(nbytes)
+        self.release(feature, key)
+        fits = self.make_room(nbytes)
+        if fits or force:
+            self.allocations[(feature, key)] = Allocation(nbytes, evict)
+        return fits
+
+    def make_room(self, nbytes: int) -> bool:
+        """Evict caches in LRU order until nbytes fit into the budget.
+
+        Nothing is evicted if evicting all caches would not be enough.
+        """
+        if self.fits(nbytes):
+            return True
+        evictable = sum(
+            a.nbytes for a in self.allocations.values() if a.evict is not None
+        )
+        if nbytes > self.available + evictable:
+            return False
+        for k in list(self.allocations):
+            if self.fits(nbytes):
+                break
+            allocation = self.allocations[k]
+            if allocation.evict is not None:
+                del self.allocations[k]
+                allocation.evict()
+        return self.fits(nbytes)
+
+    def touch(self, feature: str, key: str) -> None:
+        """Mark key of feature as most recently used."""
+        if (feature, key) in self.allocations:
+            self.allocations.move_to_end((feature, key))
+
+    def release(self, feature: str, key: Optional[str] = None) -> None:
+        """Stop accounting key of feature or all keys of feature if None."""
+        for k in list(self.allocations):
+            if k[0] == feature and (key is None or k[1] == key):
+                del self.allocations[k]
+
+    def release_prefix(self, prefix: str) -> None:
+        """Stop accounting all keys starting with prefix over all features."""
+        for k in list(self.allocations):
+            if k[1].startswith(prefix):
+                del self.allocations[k]
+
+    def by_feature(self) -> Dict[str, int]:
+        """Return bytes held per feature."""
+        report: Dict[str, int] = {}
+        for (feature, _), a in self.allocations.items():
+            report[feature] = report.get(feature, 0) + a.nbytes
+        return report
+
+    def by_key(self) -> Dict[str, int]:
+        """Return bytes held per key, i.e. per layer, over all features."""
+        report: Dict[str, int] = {}
+        for (_, key), a in self.allocations.items():
+            report[key] = report.get(key, 0) + a.nbytes
+        return report
+
+    def report(self) -> Dict[str, Dict[str, int]]:
+        """Return bytes held per key for every feature."""
+        report: Dict[str, Dict[str, int]] = {}
+        for (feature, key), a in self.allocations.items():
+            report.setdefault(feature, {})[key] = a.nbytes
+        return report
+
+
+_MEMORY_BUDGET: Optional[MemoryBudget] = None
+
+
+def get_memory_budget() -> MemoryBudget:
+    """Return the memory accountant shared by all widgets."""
+    global _MEMORY_BUDGET
+    if _MEMORY_BUDGET is None:
+        _MEMORY_BUDGET = MemoryBudget.from_env()
+    return _MEMORY_BUDGET
@@ -0,0 +1,333 @@
+"""Play the ortho viewer position along a path and export the frames."""
+import contextlib
+import queue
+import threading
+import warnings
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+from napari.layers import Labels
+from qtpy.QtCore import QObject
+from qtpy.QtCore import QTimer
+from qtpy.QtCore import Signal
+
+from ._label_cache import LabelIndexCache
+
+# world coordinates of the ortho viewer position
+Position = Tuple[float, float, float]
+
+
+def line_path(
+    start: Sequence[float], stop: Sequence[float], n_frames: int
+) -> List[Position]:
+    """Return n_frames positions on the line from start to stop."""
+    points = np.linspace(start, stop, n_frames)
+    return [tuple(float(c) for c in p) for p in points]
+
+
+def centroid_path(
+    layer: Labels,
+    label_ids: Optional[Iterable[int]] = None,
+    cache: Optional[LabelIndexCache] = None,
+) -> List[Position]:
+    """Return centroids of label_ids or of all labels of layer by id."""
+    if cache is None:
+        cache = LabelIndexCache()
+    index = cache.get_layer(layer)
+    centroids = dict(zip(index["labels"], index["centroids"]))
+    if label_ids is None:
+        label_ids = index["labels"]
+    return [
+        tuple(float(c) for c in layer.data_to_world(centroids[i]))
+        for i in label_ids
+    ]
+
+
+class FrameWriter:
+    """Write frames to disk in a background thread.
+
+    The first error stops writing, the remaining frames are discarded.
+    """
+
+    def __init__(
+        self,
+        output_dir: Union[str, Path],
+        maxsize: int = 16,
+        on_done: Optional[Callable[[], None]] = None,
+    ):
+        """Start writer thread, at most maxsize frames wait in memory.
+
+        on_done is called from the writer thread once it stopped.
+        """
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.n_written = 0
+        self.error: Optional[Exception] = None
+        self.on_done = on_done
+        self._closed = False
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def alive(self) -> bool:
+        """Check whether the writer thread is still running."""
+        return self._thread.is_alive()
+
+    def full(self) -> bool:
+        """Check whether putting another frame would block."""
+        return self.alive and self._queue.full()
+
+    def put(self, frame: int, images: Dict[str, np.ndarray]) -> None:
+        """Queue images of one frame, named by view."""
+        if self.error is not None:
+            raise self.error
+        if self._closed or not self.alive:
+            raise RuntimeError("Frame writer is closed")
+        self._queue.put((frame, images))
+
+    def close(self, wait: bool = True) -> None:
+        """Write the remaining frames and stop the writer thread.
+
+        Without wait this returns immediately, use on_done to get notified.
+        """
+        self._closed = True
+        # if full, the thread stops by itself once the queue is drained
+        with contextlib.suppress(queue.Full):
+            self._queue.put_nowait(None)
+        if wait:
+            self._thread.join()
+            if self.error is not None:
+                raise self.error
+
+    def _run(self) -> None:
+        try:
+            self._write_frames()
+        finally:
+            if self.on_done is not None:
+                self.on_done()
+
+    def _write_frames(self) -> None:
+        from skimage.io import imsave
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self.error is None:
+                frame, images = item
+                try:
+                    for view, image in images.items():
+                        name = f"frame_{frame:05d}_{view}.png"
+                        imsave(
+                            self.output_dir / name, image, check_contrast=False
+                        )
+                    self.n_written += 1
+                except Exception as e:  # noqa: BLE001
+                    self.error = e
+            if self._closed and self._queue.empty():
+                return
+
+
+class Playback(QObject):
+    """Move the ortho viewer along positions at a steady frame rate.
+
+    The planes of the upcoming frames are read ahead in worker threads.
+    A frame whose planes are not ready yet, or that could not be handed to
+    the writer without blocking, is retried on the next tick, so the GUI
+    never waits. Any error stops playback and is kept in error.
+
+    Planes read ahead and frames queued for the writer are accounted in
+    the memory budget of the widget, both are reduced to fit.
+    """
+
+    finished = Signal()
+    # emitted from the writer thread, hence queued to the GUI thread
+    _writer_done = Signal(object)
+
+    def __init__(
+        self,
+        widget,
+        positions: Sequence[Position],
+        fps: float = 10.0,
+        lookahead: int = 8,
+        output_dir: Optional[Union[str, Path]] = None,
+        queue_size: int = 16,
+        parent: Optional[QObject] = None,
+    ):
+        """Initialize playback of positions on widget.
+
+        At most queue_size frames wait in memory for the writer.
+        """
+        super().__init__(parent)
+        if fps <= 0:
+            raise ValueError("fps must be positive")
+        if lookahead < 1 or queue_size < 1:
+            raise ValueError("lookahead and queue_size must be at least 1")
+        self.widget = widget
+        self.positions = [widget.clip_position(p) for p in positions]
+        self.lookahead = lookahead
+        self.output_dir = output_dir
+        self.queue_size = queue_size
+        self.frame = 0
+        self.n_late = 0
+        self.error: Optional[Exception] = None
+
+        self._buffer: Dict[int, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._writer: Optional[FrameWriter] = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(int(1000 / fps))
+        self._timer.timeout.connect(self._tick)
+        self._writer_done.connect(self._finish)
+
+    @property
+    def running(self) -> bool:
+        """Check whether playback is going on."""
+        return self._timer.isActive()
+
+    def start(self) -> None:
+        """Start playback from the current frame.
+
+        Raises RuntimeError if not even one frame to read ahead and two
+        frames to export fit into the budget.
+        """
+        reading = self._executor is None
+        writing = self.output_dir is not None and self._writer is None
+        # the frame being written is held on top of the queue, the queue
+        # only grows with what is left after the lookahead
+        screenshot_nbytes = self.widget.screenshot_nbytes() if writing else 0
+        try:
+            if writing:
+                self._reserve("writer", screenshot_nbytes, 2, least=2)
+            if reading:
+                self.lookahead = self._reserve(
+                    "lookahead", self.widget.frame_nbytes(), self.lookahead
+                )
+            if writing:
+                self.queue_size = (
+                    self._reserve(
+                        "writer",
+                        screenshot_nbytes,
+                        self.queue_size + 1,
+                        least=2,
+                    )
+                    - 1
+                )
+        except RuntimeError:
+            if writing:
+                self._release("writer")
+            if reading:
+                self._release("lookahead")
+            raise
+
+        if reading:
+            self._executor = ThreadPoolExecutor(max_workers=2)
+        if writing:
+            writer = FrameWriter(
+                self.output_dir,
+                maxsize=self.queue_size,
+                on_done=lambda: self._writer_done.emit(writer),
+            )
+            self._writer = writer
+        self._prefetch()
+        self._timer.start()
+
+    def stop(self) -> None:
+        """Stop playback, finished is emitted once all frames are written."""
+        if self._executor is None:
+            return
+        self._timer.stop()
+        for future in self._buffer.values():
+            future.cancel()
+        self._buffer.clear()
+        self._executor.shutdown(wait=False)
+        self._executor = None
+        self._release("lookahead")
+        writer, self._writer = self._writer, None
+        if writer is None:
+            self._finish()
+        else:
+            writer.close(wait=False)
+
+    def _finish(self, writer: Optional[FrameWriter] = None) -> None:
+        """Report errors of playback and writer and emit finished."""
+        if self._writer is None:
+            self._release("writer")
+        if self.error is None and writer is not None:
+            self.error = writer.error
+        if self.error is not None:
+            warnings.warn(f"Playback failed: {self.error!r}", stacklevel=2)
+        self.finished.emit()
+
+    def _reserve(self, name: str, nbytes: int, n: int, least: int = 1) -> int:
+        """Account up to n frames of nbytes, return how many fit.
+
+        Raises RuntimeError if less than least frames fit.
+        """
+        memory = self.widget.memory
+        key = self.widget.memory_key(f"playback {name}")
+        for i in range(n, least - 1, -1):
+            if memory.request("playback", key, i * nbytes):
+                if i < n:
+                    warnings.warn(
+                        f"Playback {name} reduced from {n} to {i} frames "
+                        "to fit into the memory budget",
+                        stacklevel=3,
+                    )
+                return i
+        raise RuntimeError(
+            f"Playback {name} does not fit into the memory budget"
+        )
+
+    def _release(self, name: str) -> None:
+        """Stop accounting items reserved under name."""
+        self.widget.memory.release(
+            "playback", self.widget.memory_key(f"playback {name}")
+        )
+
+    def _prefetch(self) -> None:
+        """Read planes of the next lookahead frames in worker threads."""
+        stop = min(self.frame + self.lookahead, len(self.positions))
+        for i in range(self.frame, stop):
+            if i not in self._buffer:
+                self._buffer[i] = self._executor.submit(
+                    self.widget.extract_planes, *self.positions[i]
+                )
+
+    def _tick(self) -> None:
+        """Show the next frame if its planes are ready."""
+        if self.frame >= len(self.positions):
+            self.stop()
+            return
+
+        future = self._buffer[self.frame]
+        if not future.done() or (
+            self._writer is not None and self._writer.full()
+        ):
+            self.n_late += 1
+            return
+
+        del self._buffer[self.frame]
+        try:
+            self.widget.set_position(
+                *self.positions[self.frame], planes=future.result()
+            )
+            if self._writer is not None:
+                self._writer.put(self.frame, self.widget.screenshot_views())
+        except Exception as e:  # noqa: BLE001
+            self.error = e
+            self.stop()
+            return
+        self.frame += 1
+        self._prefetch()
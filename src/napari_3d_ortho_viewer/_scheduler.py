@@ -0,0 +1,117 @@
+"""Schedule expensive updates at most once per frame in a worker thread."""
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Deque
+from typing import Optional
+from typing import Tuple
+
+from qtpy.QtCore import QObject
+from qtpy.QtCore import QTimer
+from qtpy.QtCore import Signal
+
+# one frame at 60 Hz
+FRAME_BUDGET = 0.016
+
+
+class FrameScheduler(QObject):
+    """Run only the latest submitted job, at most once per frame budget.
+
+    compute(job) runs in a worker thread, apply(job, result) afterwards in
+    the GUI thread. Jobs submitted while another one is waiting replace it,
+    so stale intermediate jobs are dropped instead of queued up.
+    """
+
+    _finished = Signal(object)
+
+    def __init__(
+        self,
+        compute: Callable[[Any], Any],
+        apply: Callable[[Any, Any], None],
+        frame_budget: float = FRAME_BUDGET,
+        parent: Optional[QObject] = None,
+    ):
+        """Initialize scheduler with compute and apply and budget in s."""
+        super().__init__(parent)
+        self.compute = compute
+        self.apply = apply
+        self.frame_budget = frame_budget
+
+        # seconds from submit until apply returned of the most recent jobs
+        self.latencies: Deque[float] = deque(maxlen=100)
+        self.n_dropped = 0
+
+        self._pending: Optional[Tuple[Any, float]] = None
+        self._running = False
+        self._last_start = -float("inf")
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._start)
+        # emitted from the worker thread, hence queued to the GUI thread
+        self._finished.connect(self._finish)
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Return latency of the last applied job in s."""
+        return self.latencies[-1] if self.latencies else None
+
+    @property
+    def mean_latency(self) -> Optional[float]:
+        """Return mean latency of the recently applied jobs in s."""
+        if not self.latencies:
+            return None
+        return sum(self.latencies) / len(self.latencies)
+
+    def submit(self, job: Any) -> None:
+        """Schedule job, replacing the job that has not yet started."""
+        if self._pending is not None:
+            self.n_dropped += 1
+        self._pending = (job, time.perf_counter())
+        self._schedule()
+
+    def cancel(self) -> None:
+        """Drop the waiting job and shut down the worker thread.
+
+        A running job is still applied, the next job starts a new worker.
+        """
+        self._timer.stop()
+        self._pending = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _schedule(self) -> None:
+        """Start the timer for the pending job if nothing else is going on."""
+        if self._pending is None or self._running or self._timer.isActive():
+            return
+        wait = self._last_start + self.frame_budget - time.perf_counter()
+        self._timer.start(int(max(0.0, wait) * 1000))
+
+    def _start(self) -> None:
+        """Run compute of the pending job in the worker thread."""
+        if self._pending is None or self._running:
+            return
+        job, submitted = self._pending
+        self._pending = None
+        self._running = True
+        self._last_start = time.perf_counter()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        future = self._executor.submit(self.compute, job)
+        future.add_done_callback(
+            lambda f: self._finished.emit((job, submitted, f))
+        )
+
+    def _finish(self, args: Tuple[Any, float, Future]) -> None:
+        """Apply the result in the GUI thread and start the next job."""
+        job, submitted, future = args
+        self._running = False
+        try:
+            self.apply(job, future.result())
+            self.latencies.append(time.perf_counter() - submitted)
+        finally:
+            self._schedule()
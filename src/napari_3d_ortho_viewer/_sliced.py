@@ -0,0 +1,101 @@
+"""Compact three-plane buffers of img layers for the 3d view."""
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+from napari.layers import Image
+
+# z, y and x plane of all channels of a plane buffer
+Planes = Tuple[np.ndarray, np.ndarray, np.ndarray]
+# names of the z, y and x planes
+PLANE_VIEWS = ("xy", "xz", "yz")
+
+
+class PlaneBuffer:
+    """Planes through the current position of channels with equal shape.
+
+    Channels are either separate img layers or the trailing rgb axis of a
+    layer. The planes of all channels live in one buffer per plane, so
+    a position update is a single vectorized copy per plane.
+    """
+
+    def __init__(self, layers: List[Image]):
+        """Initialize buffer for layers of equal shape and dtype."""
+        self.layers = layers
+        self.shape: Tuple[int, ...] = tuple(layers[0].data.shape)
+        self.dtype = np.dtype(layers[0].data.dtype)
+        self.position: Optional[Tuple[int, int, int]] = None
+        self.xy: Optional[np.ndarray] = None
+        self.xz: Optional[np.ndarray] = None
+        self.yz: Optional[np.ndarray] = None
+
+    @property
+    def plane_shapes(self) -> Tuple[Tuple[int, ...], ...]:
+        """Return shapes of the z, y and x plane buffers."""
+        n = len(self.layers)
+        z, y, x, *rest = self.shape
+        return (n, y, x, *rest), (n, z, x, *rest), (n, z, y, *rest)
+
+    @property
+    def nbytes(self) -> int:
+        """Return number of bytes of all plane buffers."""
+        return sum(
+            int(np.prod(s)) * self.dtype.itemsize for s in self.plane_shapes
+        )
+
+    def plane_nbytes(self, axis: int) -> int:
+        """Return number of bytes of the plane of one channel along axis."""
+        return int(np.prod(self.plane_shapes[axis][1:])) * self.dtype.itemsize
+
+    def allocate(self) -> None:
+        """Allocate the plane buffers."""
+        self.xy, self.xz, self.yz = (
+            np.zeros(s, dtype=self.dtype) for s in self.plane_shapes
+        )
+
+    def extract(self, z_ind: int, y_ind: int, x_ind: int) -> Planes:
+        """Read planes of all channels, safe outside the GUI thread."""
+        data = [layer.data for layer in self.layers]
+        return (
+            np.stack([np.asarray(d[z_ind, ...]) for d in data]),
+            np.stack([np.asarray(d[:, y_ind, ...]) for d in data]),
+            np.stack([np.asarray(d[:, :, x_ind, ...]) for d in data]),
+        )
+
+    def fill(
+        self,
+        z_ind: int,
+        y_ind: int,
+        x_ind: int,
+        planes: Optional[Planes] = None,
+    ) -> None:
+        """Move buffer to position, copying planes if already extracted."""
+        if planes is None:
+            data = [layer.data for layer in self.layers]
+            np.stack([np.asarray(d[z_ind, ...]) for d in data], out=self.xy)
+            np.stack([np.asarray(d[:, y_ind, ...]) for d in data], out=self.xz)
+            np.stack(
+                [np.asarray(d[:, :, x_ind, ...]) for d in data], out=self.yz
+            )
+        else:
+            np.copyto(self.xy, planes[0])
+            np.copyto(self.xz, planes[1])
+            np.copyto(self.yz, planes[2])
+        self.position = (z_ind, y_ind, x_ind)
+
+    def plane(self, axis: int, channel: int) -> np.ndarray:
+        """Return view on the plane of channel along axis as a 3d array.
+
+        The plane keeps a singleton dimension along axis, so it can be
+        shown in the volume at the position of the buffer.
+        """
+        planes = (self.xy, self.xz, self.yz)
+        return np.expand_dims(planes[axis][channel], axis)
+
+
+def plane_translate(layer: Image, axis: int, ind: int) -> np.ndarray:
+    """Return translate of the plane of layer at index ind along axis."""
+    translate = np.array(layer.translate, dtype=float)
+    translate[axis] += ind * layer.scale[axis]
+    return translate
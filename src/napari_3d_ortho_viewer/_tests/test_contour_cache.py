@@ -0,0 +1,110 @@
+"""Test the per plane contour cache."""
+import numpy as np
+from napari.layers import Labels
+
+from napari_3d_ortho_viewer._contour_cache import ContourCache
+from napari_3d_ortho_viewer._contour_cache import touched_planes
+from napari_3d_ortho_viewer._memory import MemoryBudget
+
+
+def make_layer() -> Labels:
+    data = np.zeros((4, 10, 10), dtype=int)
+    data[:, 2:6, 2:6] = 1
+    layer = Labels(data)
+    layer.contour = 1
+    return layer
+
+
+def calculate(layer: Labels):
+    plane = np.asarray(layer.data[layer._slice_indices])
+    return layer._calculate_contour(plane, (slice(0, 10), slice(0, 10)))
+
+
+def test_revisited_plane_is_cached():
+    """Contours of a plane are computed only once."""
+    layer = make_layer()
+    cache = ContourCache("xy", memory=MemoryBudget())
+    assert cache.install(layer)
+
+    first = calculate(layer)
+    assert calculate(layer) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    contour = first.copy()
+    layer._slice_dims(point=(1, 0, 0))
+    calculate(layer)
+    assert cache.misses == 2
+    assert cache.memory.by_key() == {"xy": 2 * contour.nbytes}
+
+
+def test_lru_eviction():
+    """Least recently used planes are evicted beyond maxsize."""
+    layer = make_layer()
+    cache = ContourCache("xy", maxsize=2, memory=MemoryBudget())
+    cache.install(layer)
+
+    for z in [0, 1, 0, 2]:
+        layer._slice_dims(point=(z, 0, 0))
+        calculate(layer)
+
+    assert [key[1] for key in cache.entries] == [((0, 0),), ((0, 2),)]
+
+
+def test_invalidate_touched_planes_only():
+    """Paint edits only invalidate the planes they touched."""
+    layer = make_layer()
+    cache = ContourCache("xy", memory=MemoryBudget())
+    cache.install(layer)
+    for z in range(4):
+        layer._slice_dims(point=(z, 0, 0))
+        calculate(layer)
+
+    layer.paint((1, 3, 3), 2)
+    history_item = layer._undo_history[-1]
+    cache.invalidate(touched_planes(history_item))
+
+    assert [key[1] for key in cache.entries] == [
+        ((0, 0),),
+        ((0, 2),),
+        ((0, 3),),
+    ]
+
+
+def test_install_checks_signature():
+    """Layers with an unknown _calculate_contour are not cached."""
+    layer = make_layer()
+    layer._calculate_contour = lambda labels, data_slice, extra: None
+    assert not ContourCache("xy", memory=MemoryBudget()).install(layer)
+
+
+def test_entries_dropped_over_budget():
+    """Entries that do not fit into the budget are dropped on invalidate."""
+    layer = make_layer()
+    memory = MemoryBudget()
+    cache = ContourCache("xy", memory=memory)
+    cache.install(layer)
+    for z in range(2):
+        layer._slice_dims(point=(z, 0, 0))
+        calculate(layer)
+
+    memory.budget = 0
+    cache.invalidate({0: {1}})
+    assert not cache.entries
+    assert memory.used == 0
+
+
+def test_in_place_edit_recomputed():
+    """Contours follow in place edits of the data after a refresh."""
+    layer = make_layer()
+    cache = ContourCache("xy", memory=MemoryBudget())
+    cache.install(layer)
+    first = calculate(layer).copy()
+
+    layer.data[0, 6:8, 6:8] = 2
+    layer.refresh()
+
+    fresh = Labels(layer.data)
+    fresh.contour = 1
+    np.testing.assert_array_equal(calculate(layer), calculate(fresh))
+    assert not np.array_equal(calculate(layer), first)
+    assert len(cache.entries) == 1
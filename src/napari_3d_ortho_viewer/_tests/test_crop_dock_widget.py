@@ -0,0 +1,53 @@
+"""Test the crop widgets reading label indexes from the cache."""
+import numpy as np
+import pytest
+
+from napari_3d_ortho_viewer._crop_dock_list_widget import (
+    CropListLabelsWidget,
+)
+from napari_3d_ortho_viewer._crop_dock_widget import CropLabelsWidget
+from napari_3d_ortho_viewer._label_cache import CACHE_DIR_ENV
+
+
+@pytest.fixture
+def viewer(make_napari_viewer, tmp_path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path))
+    viewer = make_napari_viewer()
+    labels = np.zeros((10, 20, 30), dtype=int)
+    labels[1:3, 2:5, 3:7] = 1
+    labels[5:9, 10:20, 0:30] = 7
+    viewer.add_labels(labels)
+    return viewer
+
+
+def test_crop_slices(viewer):
+    """Slices cover the padded bboxes of the selected labels."""
+    widget = CropLabelsWidget(viewer)
+    widget.padding_field.value = "1"
+    widget.labels_field.value = "1"
+    assert widget.get_slices() == (slice(0, 4), slice(1, 6), slice(2, 8))
+
+    # programmatic edits are found instead of failing on a stale index
+    viewer.layers[0].data[0, 0, 0] = 3
+    viewer.layers[0].refresh()
+    widget.labels_field.value = "3"
+    assert widget.get_slices() == (slice(0, 2), slice(0, 2), slice(0, 2))
+
+    widget.labels_field.value = "5"
+    with pytest.raises(ValueError):
+        widget.get_slices()
+
+
+def test_update_ids_after_edit(viewer):
+    """Update IDs recomputes the index after programmatic edits."""
+    widget = CropListLabelsWidget(viewer)
+    assert widget.id_selection.choices == (7, 1)
+
+    viewer.layers[0].data[0, 0, 0] = 3
+    viewer.layers[0].refresh()
+    widget.update_ids()
+    assert widget.id_selection.choices == (7, 1, 3)
+
+    widget.id_selection.value = [3]
+    widget.padding_field.value = "0"
+    assert widget.get_slices() == (slice(0, 1), slice(0, 1), slice(0, 1))
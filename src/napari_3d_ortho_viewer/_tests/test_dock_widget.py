@@ -82,3 +82,134 @@ def test_checkbox_changed(
 
     widget.checkbox.value = False
     assert widget.xy_viewer is None
+
+
+def test_anisotropic_scale(make_napari_viewer):
+    """Positions map through layer scale and translate, not resampling."""
+    viewer = make_napari_viewer()
+    img = viewer.add_image(
+        np.random.random((20, 30, 40)), scale=(5, 1, 1), translate=(2, 0, 0)
+    )
+    viewer.add_labels(np.zeros((100, 30, 40), dtype=int))
+    widget = napari_3d_ortho_viewer.OrthoViewerWidget(viewer)
+    widget.checkbox.value = True
+
+    assert widget.shape == (100, 30, 40)
+    xy, xz, yz = widget.sliced_img_layers
+    assert tuple(xy.scale) == (5, 1, 1)
+
+    Event = namedtuple("Event", ["position"])
+    widget.mouse_click(widget.xy_viewer, Event(position=(52.0, 10.0, 11.0)))
+
+    assert (widget.z_ind, widget.y_ind, widget.x_ind) == (52, 10, 11)
+    assert widget.plane_buffers[0].position == (10, 10, 11)
+    np.testing.assert_array_equal(xy.data[0], img.data[10])
+    np.testing.assert_array_equal(xz.data[:, 0], img.data[:, 10])
+    np.testing.assert_array_equal(yz.data[..., 0], img.data[..., 11])
+    assert tuple(xy.translate) == (52, 0, 0)
+    assert tuple(yz.translate) == (2, 0, 11)
+
+    widget.checkbox.value = False
+
+
+def test_memory_accounted_per_widget(make_napari_viewer):
+    """Stopping one widget keeps the accounting of other widgets."""
+    widgets = []
+    for _ in range(2):
+        viewer = make_napari_viewer()
+        viewer.add_image(np.random.random((10, 10, 10)))
+        widget = napari_3d_ortho_viewer.OrthoViewerWidget(viewer)
+        widget.checkbox.value = True
+        widgets.append(widget)
+
+    def keys(widget):
+        return [
+            key
+            for key in widget.memory.by_key()
+            if key.startswith(widget.memory_prefix)
+        ]
+
+    first, second = widgets
+    n_keys = len(keys(second))
+    assert len(keys(first)) == n_keys > 0
+
+    first.checkbox.value = False
+    assert keys(first) == []
+    assert len(keys(second)) == n_keys
+
+    second.checkbox.value = False
+
+
+def test_mixed_resolution(make_napari_viewer):
+    """Position is kept in world coordinates on the finest grid."""
+    viewer = make_napari_viewer()
+    coarse_z = viewer.add_image(
+        np.random.random((20, 15, 20)), scale=(1, 2, 2)
+    )
+    viewer.add_image(np.random.random((4, 60, 80)), scale=(5, 0.5, 0.5))
+    widget = napari_3d_ortho_viewer.OrthoViewerWidget(viewer)
+    widget.checkbox.value = True
+
+    assert widget.shape == (20, 60, 80)
+    np.testing.assert_array_equal(widget.grid_scale, (1, 0.5, 0.5))
+
+    widget.xy_viewer.dims.set_point(0, 3)
+    assert widget.z_ind == 3
+    xy = widget.sliced_img_layers[0]
+    assert xy.translate[0] == 3
+    np.testing.assert_array_equal(xy.data[0], coarse_z.data[3])
+
+    # only covered by the first layer
+    Event = namedtuple("Event", ["position"])
+    widget.mouse_click(widget.xy_viewer, Event(position=(18.0, 4.0, 30.0)))
+    assert (widget.z_ind, widget.y_ind, widget.x_ind) == (18, 8, 60)
+    assert widget.plane_buffers[0].position == (18, 2, 15)
+    assert widget.plane_buffers[1].position == (3, 8, 60)
+    assert widget.click_history == [(18.0, 4.0, 30.0)]
+
+    # the ortho slicing layers are single planes moved to the position
+    assert widget.xy_slicing.data.shape == (1, 60, 80)
+    assert tuple(widget.xy_slicing.translate) == (18, 0, 0)
+    assert tuple(widget.yz_slicing.translate) == (0, 0, 30)
+    assert tuple(widget.xz_slicing.translate) == (0, 4, 0)
+    assert widget.xy_slicing.data[0, 8, 0] == 2
+    assert widget.xy_slicing.data[0, 0, 60] == 3
+
+    widget.checkbox.value = False
+
+
+def test_slicing_over_budget_warns(make_napari_viewer, monkeypatch):
+    """Ortho slicing layers over the memory budget are added with a warning."""
+    viewer = make_napari_viewer()
+    viewer.add_image(np.random.random((10, 10, 10)))
+    widget = napari_3d_ortho_viewer.OrthoViewerWidget(viewer)
+    monkeypatch.setattr(widget.memory, "budget", 1)
+
+    with pytest.warns(UserWarning, match="Slicing layer"):
+        widget.checkbox.value = True
+    assert widget.xy_slicing.data.shape == (1, 10, 10)
+    assert widget.vol_slicing_plane is None
+
+    widget.checkbox.value = False
+
+
+def test_hover_planes_of_previous_start_are_dropped(make_napari_viewer):
+    """Planes read before a restart are not applied to the new buffers."""
+    viewer = make_napari_viewer()
+    viewer.add_image(np.random.random((10, 10, 10)))
+    widget = napari_3d_ortho_viewer.OrthoViewerWidget(viewer)
+    widget.checkbox.value = True
+
+    job = (widget.generation, (5.0, 5.0, 5.0))
+    planes = widget.extract_planes_at(job)
+    widget.checkbox.value = False
+    viewer.add_image(np.random.random((10, 10, 10)))
+    widget.checkbox.value = True
+
+    widget.apply_planes_at(job, planes)
+    assert widget.plane_buffers[0].position == (0, 0, 0)
+
+    job = (widget.generation, (5.0, 5.0, 5.0))
+    widget.apply_planes_at(job, widget.extract_planes_at(job))
+    assert widget.plane_buffers[0].position == (5, 5, 5)
+    widget.checkbox.value = False
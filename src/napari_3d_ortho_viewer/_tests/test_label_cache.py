@@ -0,0 +1,167 @@
+"""Test the on-disk label index cache."""
+import os
+
+import numpy as np
+from napari.layers import Labels
+
+from napari_3d_ortho_viewer import _label_cache
+from napari_3d_ortho_viewer._label_cache import LabelIndexCache
+from napari_3d_ortho_viewer._label_cache import compute_label_index
+from napari_3d_ortho_viewer._label_cache import fingerprint
+from napari_3d_ortho_viewer._label_cache import is_edited
+from napari_3d_ortho_viewer._label_cache import mark_edited
+
+
+def make_labels() -> np.ndarray:
+    labels = np.zeros((10, 20, 30), dtype=np.uint16)
+    labels[1:3, 2:5, 3:7] = 1
+    labels[5:9, 10:20, 0:30] = 7
+    return labels
+
+
+def test_fingerprint_depends_on_content_shape_and_dtype():
+    """Fingerprint changes whenever data, shape or dtype change."""
+    labels = make_labels()
+    key = fingerprint(labels)
+
+    assert fingerprint(labels.copy()) == key
+    assert fingerprint(labels.astype(np.int32)) != key
+    assert fingerprint(labels.reshape(20, 10, 30)) != key
+
+    changed = labels.copy()
+    changed[0, 0, 0] = 3
+    assert fingerprint(changed) != key
+
+
+def test_fingerprint_samples_big_arrays(monkeypatch):
+    """Big arrays are sampled over all axes and along whole slabs."""
+    monkeypatch.setattr(_label_cache, "FULL_HASH_NBYTES", 0)
+    monkeypatch.setattr(_label_cache, "SAMPLE_NBYTES", 1500)
+    monkeypatch.setattr(_label_cache, "N_HASH_SLABS", 2)
+    labels = make_labels()
+    key = fingerprint(labels)
+
+    # neither on the strided subsample nor in the first or last slab
+    changed = labels.copy()
+    changed[4, 1, 1] = 1
+    assert fingerprint(changed) == key
+
+    # on the subsample with a step of 2 per axis, far from both slabs
+    changed[4, 2, 2] = 1
+    assert fingerprint(changed) != key
+
+
+def test_compute_label_index():
+    """Index contains areas and bboxes ordered by label id."""
+    index = compute_label_index(make_labels())
+
+    np.testing.assert_array_equal(index["labels"], [1, 7])
+    np.testing.assert_array_equal(index["areas"], [24, 1200])
+    np.testing.assert_array_equal(
+        index["bboxes"], [[1, 2, 3, 3, 5, 7], [5, 10, 0, 9, 20, 30]]
+    )
+    assert index["centroids"].shape == (2, 3)
+    labels = make_labels()
+    for label, anchor in zip(index["labels"], index["anchors"]):
+        assert labels[tuple(anchor)] == label
+
+
+def test_cache_roundtrip(tmp_path, monkeypatch):
+    """Second access is served from disk without recomputation."""
+    cache = LabelIndexCache(tmp_path)
+    labels = make_labels()
+
+    assert cache.load(labels) is None
+    index = cache.get(labels)
+    assert cache.path(fingerprint(labels)).is_file()
+
+    def fail(data):
+        raise AssertionError("label index was recomputed")
+
+    monkeypatch.setattr(_label_cache, "compute_label_index", fail)
+    cached = cache.get(labels)
+    for k, v in index.items():
+        np.testing.assert_array_equal(cached[k], v)
+
+
+def test_cache_rejects_invalid_entries(tmp_path):
+    """Corrupt or mismatching entries are ignored."""
+    cache = LabelIndexCache(tmp_path)
+    labels = make_labels()
+    key = fingerprint(labels)
+
+    cache.path(key).write_bytes(b"no npz file")
+    assert cache.load(labels) is None
+
+    cache.save(labels.astype(np.int32), compute_label_index(labels), key)
+    assert cache.load(labels) is None
+
+
+def test_edited_layers_bypass_disk_cache(tmp_path, monkeypatch):
+    """Edits missed by the sampled fingerprint do not return stale ids."""
+    monkeypatch.setattr(_label_cache, "FULL_HASH_NBYTES", 0)
+    monkeypatch.setattr(_label_cache, "SAMPLE_NBYTES", 1500)
+    monkeypatch.setattr(_label_cache, "N_HASH_SLABS", 2)
+    cache = LabelIndexCache(tmp_path)
+    layer = Labels(make_labels())
+    np.testing.assert_array_equal(cache.get_layer(layer)["labels"], [1, 7])
+
+    key = fingerprint(layer.data)
+    layer.brush_size = 1
+    layer.paint((4, 1, 1), 3, refresh=False)
+    assert fingerprint(layer.data) == key
+    assert is_edited(layer)
+    np.testing.assert_array_equal(cache.get_layer(layer)["labels"], [1, 3, 7])
+
+    # a copied layer sharing the data, as in the ortho views
+    copy = Labels(make_labels())
+    assert not is_edited(copy)
+    mark_edited(copy.data)
+    assert is_edited(Labels(copy.data))
+
+
+def test_prune_least_recently_used(tmp_path):
+    """Cache directory is kept below max_nbytes."""
+    cache = LabelIndexCache(tmp_path)
+    labels = make_labels()
+    other = labels.copy()
+    other[0, 0, 0] = 2
+    for data in [labels, other]:
+        cache.save(data, compute_label_index(data))
+    os.utime(cache.path(fingerprint(labels)), (0, 0))
+
+    cache.max_nbytes = cache.path(fingerprint(other)).stat().st_size
+    cache.prune()
+    assert [p.stem for p in tmp_path.glob("*.npz")] == [fingerprint(other)]
+
+
+def test_cache_rejects_moved_labels(tmp_path, monkeypatch):
+    """Entries whose labels are not found at their anchors are ignored."""
+    cache = LabelIndexCache(tmp_path)
+    labels = make_labels()
+    cache.get(labels)
+
+    # simulate an edit that is missed by the fingerprint
+    key = fingerprint(labels)
+    relabeled = np.where(labels == 7, 8, labels).astype(labels.dtype)
+    monkeypatch.setattr(_label_cache, "fingerprint", lambda data: key)
+    assert cache.load(relabeled) is None
+    np.testing.assert_array_equal(cache.get(relabeled)["labels"], [1, 8])
+
+
+def test_force_recomputes(tmp_path, monkeypatch):
+    """Forced access recomputes even if a valid entry is stored."""
+    cache = LabelIndexCache(tmp_path)
+    labels = make_labels()
+    cache.get(labels)
+
+    computed = []
+    compute = _label_cache.compute_label_index
+    monkeypatch.setattr(
+        _label_cache,
+        "compute_label_index",
+        lambda data: computed.append(1) or compute(data),
+    )
+    cache.get(labels)
+    cache.get(labels, force=True)
+    assert computed == [1]
@@ -0,0 +1,87 @@
+"""Test the memory accountant."""
+import pytest
+
+from napari_3d_ortho_viewer._memory import MemoryBudget
+from napari_3d_ortho_viewer._memory import parse_nbytes
+
+
+@pytest.mark.parametrize(
+    "s, nbytes",
+    [("1024", 1024), ("2K", 2048), ("1.5M", 3 * 2**19), ("4GB", 2**32)],
+)
+def test_parse_nbytes(s, nbytes):
+    """Sizes with and without units are parsed."""
+    assert parse_nbytes(s) == nbytes
+
+
+@pytest.mark.parametrize("s", ["many", "inf", "nan", "-1K"])
+def test_parse_nbytes_invalid(s):
+    """Invalid sizes raise ValueError."""
+    with pytest.raises(ValueError):
+        parse_nbytes(s)
+
+
+def test_report_per_feature_and_key():
+    """Bytes are reported per feature and per key."""
+    memory = MemoryBudget()
+    assert memory.request("sliced images", "img", 100)
+    assert memory.request("slicing", "img", 10)
+    assert memory.request("slicing", "lbl", 20)
+
+    assert memory.used == 130
+    assert memory.by_feature() == {"sliced images": 100, "slicing": 30}
+    assert memory.by_key() == {"img": 110, "lbl": 20}
+
+    memory.release("slicing")
+    assert memory.report() == {"sliced images": {"img": 100}}
+
+
+def test_refuse_over_budget():
+    """Requests that do not fit are refused unless forced."""
+    memory = MemoryBudget(100)
+    assert memory.request("a", "x", 80)
+    assert not memory.request("a", "y", 30)
+    assert memory.used == 80
+
+    assert not memory.request("a", "y", 30, force=True)
+    assert memory.used == 110
+    assert memory.available == -10
+
+
+def test_evict_caches_in_lru_order():
+    """Caches are evicted least recently used first to make room."""
+    evicted = []
+    memory = MemoryBudget(100)
+    for key in "abc":
+        memory.request(
+            "cache", key, 30, evict=lambda k=key: evicted.append(k)
+        )
+    memory.touch("cache", "a")
+
+    assert memory.request("other", "d", 40)
+    assert evicted == ["b"]
+    assert memory.request("other", "e", 30)
+    assert evicted == ["b", "c"]
+    assert memory.by_feature() == {"cache": 30, "other": 70}
+
+
+def test_release_prefix_keeps_other_keys():
+    """Releasing a prefix only releases the keys of one owner."""
+    memory = MemoryBudget()
+    memory.request("slicing", "ortho 1 | xy", 10)
+    memory.request("label contours", "ortho 1 | xz", 20)
+    memory.request("slicing", "ortho 2 | xy", 30)
+
+    memory.release_prefix("ortho 1 | ")
+    assert memory.by_key() == {"ortho 2 | xy": 30}
+
+
+def test_refused_request_evicts_nothing():
+    """Caches are kept if evicting them would not make room anyway."""
+    evicted = []
+    memory = MemoryBudget(100)
+    memory.request("cache", "a", 40, evict=lambda: evicted.append("a"))
+
+    assert not memory.request("sliced", "big", 500)
+    assert evicted == []
+    assert memory.by_key() == {"a": 40}
@@ -0,0 +1,181 @@
+"""Test playback along position paths."""
+import numpy as np
+import pytest
+from napari.layers import Labels
+
+from napari_3d_ortho_viewer import OrthoViewerWidget
+from napari_3d_ortho_viewer._label_cache import LabelIndexCache
+from napari_3d_ortho_viewer._memory import MemoryBudget
+from napari_3d_ortho_viewer._playback import FrameWriter
+from napari_3d_ortho_viewer._playback import Playback
+from napari_3d_ortho_viewer._playback import centroid_path
+from napari_3d_ortho_viewer._playback import line_path
+
+
+class FakeOrthoViewer:
+    """Record what playback does to the ortho viewer."""
+
+    def __init__(self):
+        self.extracted = []
+        self.positions = []
+        self.memory = MemoryBudget()
+
+    def memory_key(self, name):
+        return f"fake | {name}"
+
+    def frame_nbytes(self):
+        return 32
+
+    def screenshot_nbytes(self):
+        return 64
+
+    def clip_position(self, position):
+        return tuple(position)
+
+    def extract_planes(self, z_ind, y_ind, x_ind):
+        self.extracted.append((z_ind, y_ind, x_ind))
+        return [(np.full((2, 2), z_ind), None, None)]
+
+    def set_position(self, z_ind, y_ind, x_ind, planes):
+        assert planes[0][0][0, 0] == z_ind
+        self.positions.append((z_ind, y_ind, x_ind))
+
+    def screenshot_views(self):
+        return {"xy": np.zeros((4, 4, 4), dtype=np.uint8)}
+
+
+def test_line_path():
+    """Line path includes start and stop."""
+    path = line_path((0, 0, 0), (4, 8, 2), 5)
+    assert path == [(0, 0, 0), (1, 2, 0.5), (2, 4, 1), (3, 6, 1.5), (4, 8, 2)]
+
+
+def test_centroid_path(tmp_path):
+    """Centroid path follows the given label ids in world coordinates."""
+    labels = np.zeros((5, 5, 5), dtype=int)
+    labels[0:3, 0:3, 0:3] = 1
+    labels[4, 4, 4] = 2
+    layer = Labels(labels, scale=(2, 1, 1))
+    cache = LabelIndexCache(tmp_path)
+
+    assert centroid_path(layer, cache=cache) == [(2, 1, 1), (8, 4, 4)]
+    assert centroid_path(layer, [2, 1], cache=cache) == [
+        (8, 4, 4),
+        (2, 1, 1),
+    ]
+
+
+def test_frame_writer(tmp_path):
+    """All queued frames are written before close returns."""
+    writer = FrameWriter(tmp_path, maxsize=1)
+    for frame in range(3):
+        writer.put(frame, {"xy": np.zeros((4, 4, 4), dtype=np.uint8)})
+    writer.close()
+
+    assert writer.n_written == 3
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "frame_00000_xy.png",
+        "frame_00001_xy.png",
+        "frame_00002_xy.png",
+    ]
+
+
+def test_playback(qtbot, tmp_path):
+    """Playback visits every position once and exports every frame."""
+    viewer = FakeOrthoViewer()
+    positions = line_path((0, 0, 0), (9, 9, 9), 10)
+    playback = Playback(
+        viewer, positions, fps=100, lookahead=3, output_dir=tmp_path
+    )
+
+    with qtbot.waitSignal(playback.finished, timeout=5000):
+        playback.start()
+
+    assert not playback.running
+    assert viewer.positions == positions
+    assert sorted(viewer.extracted) == positions
+    assert len(list(tmp_path.iterdir())) == 10
+
+
+def test_playback_reduced_to_budget(qtbot, tmp_path):
+    """Lookahead and writer queue shrink to fit and are released after."""
+    viewer = FakeOrthoViewer()
+    viewer.memory.budget = 3 * 32 + 2 * 64
+    positions = line_path((0, 0, 0), (9, 9, 9), 10)
+    playback = Playback(
+        viewer, positions, fps=100, lookahead=8, output_dir=tmp_path
+    )
+
+    with pytest.warns(UserWarning, match="reduced"):
+        playback.start()
+    assert (playback.lookahead, playback.queue_size) == (3, 1)
+    assert viewer.memory.by_feature() == {"playback": 3 * 32 + 2 * 64}
+
+    qtbot.waitSignal(playback.finished, timeout=5000).wait()
+    assert viewer.positions == positions
+    assert viewer.memory.used == 0
+
+
+def test_playback_refused_over_budget(tmp_path):
+    """Playback does not start if two frames to export do not fit."""
+    viewer = FakeOrthoViewer()
+    viewer.memory.budget = 32 + 64
+    playback = Playback(viewer, [(0, 0, 0)], output_dir=tmp_path)
+
+    with pytest.raises(RuntimeError, match="memory budget"):
+        playback.start()
+    assert not playback.running
+    assert viewer.memory.used == 0
+
+
+def test_frame_writer_error(tmp_path):
+    """Any error stops writing and close neither blocks nor hides it."""
+    writer = FrameWriter(tmp_path, maxsize=1)
+    # the error is raised by the next put or by close
+    with pytest.raises(Exception):  # noqa: B017
+        for frame in range(3):
+            writer.put(frame, {"xy": object()})
+        writer.close()
+    writer.close(wait=False)
+    writer._thread.join()
+    assert writer.error is not None
+    assert not writer.alive
+    assert writer.n_written == 0
+
+
+def start_widget(make_napari_viewer):
+    viewer = make_napari_viewer()
+    viewer.add_image(np.random.random((20, 30, 40)))
+    widget = OrthoViewerWidget(viewer)
+    widget.checkbox.value = True
+    return widget
+
+
+def test_widget_playback_clips_positions(make_napari_viewer, qtbot):
+    """Positions outside the volume are clipped instead of failing."""
+    widget = start_widget(make_napari_viewer)
+    playback = widget.play(line_path((0, 0, 0), (20, 30, 40), 3), fps=100)
+    qtbot.waitSignal(playback.finished, timeout=5000).wait()
+
+    assert playback.error is None
+    assert playback.frame == 3
+    assert (widget.z_ind, widget.y_ind, widget.x_ind) == (19, 29, 39)
+    widget.checkbox.value = False
+
+
+def test_widget_playback_writer_error(
+    make_napari_viewer, qtbot, tmp_path, monkeypatch
+):
+    """Errors while exporting stop playback and are reported."""
+    widget = start_widget(make_napari_viewer)
+    monkeypatch.setattr(widget, "screenshot_views", lambda: {"xy": object()})
+    positions = line_path((0, 0, 0), (19, 0, 0), 20)
+
+    with pytest.warns(UserWarning, match="Playback failed"):
+        playback = widget.play(positions, fps=100, output_dir=tmp_path)
+        qtbot.waitSignal(playback.finished, timeout=5000).wait()
+
+    assert playback.error is not None
+    assert not playback.running
+    assert playback.frame < len(positions)
+    widget.checkbox.value = False
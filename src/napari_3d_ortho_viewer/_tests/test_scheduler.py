@@ -0,0 +1,64 @@
+"""Test the frame budgeted scheduler."""
+import threading
+
+from napari_3d_ortho_viewer._scheduler import FrameScheduler
+
+
+def test_latest_job_wins(qtbot):
+    """Jobs submitted while another is running are coalesced."""
+    release = threading.Event()
+    computed = []
+    applied = []
+
+    def compute(job):
+        computed.append(job)
+        release.wait(5)
+        return job * 2
+
+    scheduler = FrameScheduler(
+        compute, lambda job, result: applied.append((job, result))
+    )
+    scheduler.submit(1)
+    qtbot.waitUntil(lambda: computed == [1])
+    for job in range(2, 6):
+        scheduler.submit(job)
+    release.set()
+
+    qtbot.waitUntil(lambda: len(applied) == 2)
+    assert computed == [1, 5]
+    assert applied == [(1, 2), (5, 10)]
+    assert scheduler.n_dropped == 3
+    assert len(scheduler.latencies) == 2
+    assert scheduler.latency >= 0
+
+
+def test_cancel_drops_pending_job(qtbot):
+    """Cancelled jobs are never computed."""
+    computed = []
+    scheduler = FrameScheduler(
+        computed.append, lambda job, result: None, frame_budget=0.05
+    )
+    scheduler.submit(1)
+    scheduler.cancel()
+    qtbot.wait(100)
+    assert computed == []
+    assert scheduler.mean_latency is None
+
+
+def test_cancel_shuts_down_worker(qtbot):
+    """Cancel stops the worker thread, later jobs start a new one."""
+    applied = []
+    scheduler = FrameScheduler(
+        lambda job: job, lambda job, result: applied.append(result)
+    )
+    scheduler.submit(1)
+    qtbot.waitUntil(lambda: applied == [1])
+    executor = scheduler._executor
+
+    scheduler.cancel()
+    assert scheduler._executor is None
+    assert executor._shutdown
+
+    scheduler.submit(2)
+    qtbot.waitUntil(lambda: applied == [1, 2])
+    scheduler.cancel()
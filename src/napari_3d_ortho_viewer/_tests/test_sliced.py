@@ -0,0 +1,65 @@
+"""Test the compact plane buffers."""
+import numpy as np
+import pytest
+from napari.layers import Image
+
+from napari_3d_ortho_viewer._sliced import PlaneBuffer
+from napari_3d_ortho_viewer._sliced import plane_translate
+
+SHAPE = (6, 7, 8)
+
+
+def make_buffer(rgb: bool = False) -> PlaneBuffer:
+    rng = np.random.default_rng(0)
+    if rgb:
+        layers = [Image(rng.random((*SHAPE, 3)), rgb=True)]
+    else:
+        layers = [Image(rng.random(SHAPE)) for _ in range(3)]
+    buffer = PlaneBuffer(layers)
+    buffer.allocate()
+    return buffer
+
+
+@pytest.mark.parametrize("rgb", [False, True])
+def test_planes_are_views_on_buffer(rgb):
+    """Planes of every channel are 3d views on the buffer."""
+    buffer = make_buffer(rgb)
+    buffer.fill(2, 3, 5)
+    for channel, layer in enumerate(buffer.layers):
+        xy, xz, yz = (buffer.plane(axis, channel) for axis in range(3))
+        np.testing.assert_array_equal(xy, layer.data[2:3])
+        np.testing.assert_array_equal(xz, layer.data[:, 3:4])
+        np.testing.assert_array_equal(yz, layer.data[:, :, 5:6])
+        for plane, planes in zip(
+            [xy, xz, yz], [buffer.xy, buffer.xz, buffer.yz]
+        ):
+            assert np.shares_memory(plane, planes)
+
+
+def test_plane_translate():
+    """Planes are moved to their index in world coordinates."""
+    layer = Image(np.zeros(SHAPE), scale=(5, 1, 2), translate=(1, 0, 3))
+    np.testing.assert_array_equal(plane_translate(layer, 0, 2), (11, 0, 3))
+    np.testing.assert_array_equal(plane_translate(layer, 2, 4), (1, 0, 11))
+
+
+def test_fill_from_extracted_planes():
+    """Extracted planes give the same buffer as filling directly."""
+    buffer = make_buffer()
+    buffer.fill(1, 2, 3)
+    direct = [buffer.xy.copy(), buffer.xz.copy(), buffer.yz.copy()]
+
+    buffer.fill(0, 0, 0)
+    buffer.fill(1, 2, 3, buffer.extract(1, 2, 3))
+    for a, b in zip(direct, [buffer.xy, buffer.xz, buffer.yz]):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_buffer_is_compact():
+    """All channels together hold only their three planes."""
+    buffer = make_buffer()
+    z, y, x = SHAPE
+    assert buffer.nbytes == 3 * (y * x + z * x + z * y) * 8
+    assert sum(buffer.plane_nbytes(axis) for axis in range(3)) * 3 == (
+        buffer.nbytes
+    )